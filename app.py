@@ -1,13 +1,27 @@
+import time
+
+# --- PERFORMANCE TIMERS ---
+# Started before the heavy imports so cold start cost is visible in the logs
+_RUN_START = time.perf_counter()
+
 import streamlit as st
+import streamlit.components.v1 as components
 import psycopg2
+import psycopg2.extensions
 import pandas as pd
 import os
 from dotenv import load_dotenv
-import folium
-import folium.plugins as plugins
-from streamlit_folium import st_folium
 import urllib.parse
+import re
+import threading
+import sys
+from collections import OrderedDict
 from datetime import datetime
+from recurring_deals import (expand_recurring_deals, open_deals, next_occurrences, now_in_chicago,
+                             today_in_chicago, to_chicago_wall_clock)
+
+# Imports are cached in sys.modules, so this is only large on a cold start
+IMPORT_MS = (time.perf_counter() - _RUN_START) * 1000
 
 # Load database credentials
 load_dotenv()
@@ -33,7 +47,7 @@ CATEGORY_COLORS = {
 }
 
 # --- PURE CYBERPUNK CSS & BACKGROUND ---
-st.markdown("""
+STATIC_CSS = """
 <style>
     @import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700;800&display=swap');
 
@@ -77,8 +91,8 @@ st.markdown("""
         background-color: transparent !important;
     }
 
-    /* 2. Streamlit Tabs */
-    [data-testid="stTabs"] [data-baseweb="tab-list"] {
+    /* 2. Feed / Map View Switch (segmented control styled as tabs) */
+    [data-testid="stButtonGroup"] {
         background-color: var(--surface);
         padding: 4px;
         border-radius: 0.75rem;
@@ -86,26 +100,26 @@ st.markdown("""
         border: 1px solid var(--border);
         width: max-content;
     }
-    [data-testid="stTabs"] [data-baseweb="tab"] {
+    [data-testid="stButtonGroup"] button {
         background-color: transparent;
         color: var(--muted-foreground);
-        border-radius: 0.5rem;
+        border-radius: 0.5rem !important;
         padding: 10px 20px;
         font-size: 0.875rem;
         font-weight: 600;
-        border: none;
+        border: 1px solid transparent;
         transition: all 0.2s ease;
     }
-    [data-testid="stTabs"] [data-baseweb="tab"]:hover {
+    [data-testid="stButtonGroup"] button:hover {
         color: var(--foreground);
     }
-    [data-testid="stTabs"] [data-baseweb="tab"][aria-selected="true"] {
+    [data-testid="stButtonGroup"] button[kind="segmented_controlActive"] {
         background-color: var(--primary-alpha);
         color: var(--primary);
         border: 1px solid var(--primary);
         box-shadow: 0 0 15px rgba(0, 210, 255, 0.2); 
     }
-    [data-testid="stTabs"] [data-baseweb="tab"][aria-selected="true"] p {
+    [data-testid="stButtonGroup"] button[kind="segmented_controlActive"] p {
         color: var(--primary) !important;
     }
 
@@ -133,6 +147,7 @@ st.markdown("""
     .radar-icon { animation: radar-glow 2s infinite ease-in-out; }
     .live-count { color: var(--success); font-weight: 700; }
     .live-text { color: var(--muted-foreground); }
+    .live-age { color: var(--muted-foreground); font-weight: 500; font-size: 12px; opacity: 0.8; }
 
     /* 4. Glassmorphism Event Card */
     @keyframes fade-in {
@@ -184,34 +199,533 @@ st.markdown("""
 </style>
 
 <div id="background-container"></div>
-""", unsafe_allow_html=True)
+"""
+
+# Shared by every radio pill, only the per-category rules below change
+RADIO_BASE_CSS = """
+/* Make the background a glass container */
+[data-testid="stRadio"] {
+    background-color: var(--surface); backdrop-filter: blur(10px);
+    padding: 12px 16px; border-radius: 0.75rem; border: 1px solid var(--border);
+}
+/* Make the 'Filter by' text neon and uppercase */
+[data-testid="stRadio"] > label {
+    font-size: 0.8rem !important; font-weight: 700 !important; color: var(--foreground) !important;
+    text-transform: uppercase !important; letter-spacing: 0.5px !important; margin-bottom: 8px !important;
+}
+/* Hide the actual radio circle selectors */
+[data-testid="stRadio"] div[role="radiogroup"] > label > div:first-child { display: none; }
+/* Align them horizontally with a gap */
+[data-testid="stRadio"] div[role="radiogroup"] { display: flex; gap: 10px; flex-wrap: wrap; }
+/* Base shape of the pill */
+[data-testid="stRadio"] div[role="radiogroup"] > label {
+    padding: 8px 16px !important; border-radius: 9999px !important; font-size: 0.85rem !important;
+    font-weight: 600 !important; cursor: pointer !important; transition: all 0.3s ease !important;
+    margin: 0 !important; display: inline-flex; align-items: center; justify-content: center;
+}
+[data-testid="stRadio"] div[role="radiogroup"] > label p { color: inherit !important; font-weight: 600 !important; }
+"""
 
 
-@st.cache_data(ttl=3600)
-def fetch_data():
-    try:
+def _minify_css(css):
+    # Strip comments and collapse whitespace so every rerun ships fewer bytes
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.DOTALL)
+    return re.sub(r"\s+", " ", css).strip()
+
+
+@st.cache_resource
+def get_static_css():
+    # Built once per server process and reused by every session and rerun.
+    # Streamlit drops elements that are not re-emitted, so the markup itself
+    # still has to be sent on each rerun, but it is never rebuilt.
+    return _minify_css(STATIC_CSS)
+
+
+@st.cache_data
+def build_radio_css(filter_options):
+    """Precompute the pill CSS for every possible selection of a category set."""
+    css_by_selection = {}
+    for selected in filter_options:
+        radio_css = RADIO_BASE_CSS
+
+        # Loop through options and assign specific colors using CSS nth-child
+        for i, cat in enumerate(filter_options, 1):
+            if cat == "All":
+                color, bg = ("#F8FAFC", "rgba(248, 250, 252, 0.15)")
+            else:
+                color, bg = CATEGORY_COLORS.get(cat, ("#94A3B8", "rgba(148, 163, 184, 0.15)"))
+
+            if cat == selected:
+                # ✅ ACTIVE STATE (Explicitly targeting the 'p' tag for text color)
+                radio_css += f"""
+                [data-testid="stRadio"] div[role="radiogroup"] > label:nth-child({i}) {{
+                    background-color: {color} !important; 
+                    border: 1px solid {color} !important; 
+                    box-shadow: 0 0 15px {color} !important;
+                }}
+                [data-testid="stRadio"] div[role="radiogroup"] > label:nth-child({i}) p {{
+                    color: #0B0F19 !important; 
+                }}
+                """
+            else:
+                # ✅ INACTIVE STATE (Explicitly targeting the 'p' tag for text color)
+                radio_css += f"""
+                [data-testid="stRadio"] div[role="radiogroup"] > label:nth-child({i}) {{
+                    background-color: {bg} !important; 
+                    border: 1px solid {color} !important;
+                }}
+                [data-testid="stRadio"] div[role="radiogroup"] > label:nth-child({i}) p {{
+                    color: {color} !important;
+                }}
+                [data-testid="stRadio"] div[role="radiogroup"] > label:nth-child({i}):hover {{
+                    box-shadow: 0 0 12px {color} !important; transform: translateY(-2px) !important;
+                }}
+                """
+
+        css_by_selection[selected] = f"<style>{_minify_css(radio_css)}</style>"
+    return css_by_selection
+
+
+# Options of the Feed / Map view switch
+FEED_VIEW = "📇 Event Feed"
+MAP_VIEW = "📍 Live Map"
+
+
+@st.cache_resource
+def load_map_stack():
+    # folium is the heaviest import in the app, so it is deferred until
+    # the Live Map view is first selected instead of paid at startup.
+    start = time.perf_counter()
+    import folium
+    import folium.plugins as plugins
+    print(f"⏱️ Map stack imported in {(time.perf_counter() - start) * 1000:.0f} ms")
+    return folium, plugins
+
+
+st.markdown(get_static_css(), unsafe_allow_html=True)
+
+
+# How long a snapshot is served before a background refresh is kicked off
+DATA_TTL_SECONDS = 3600
+
+# Bounds on every refresh, so a hung connect or query can never hold the refresh lock forever
+DB_CONNECT_TIMEOUT_SECONDS = 10
+DB_STATEMENT_TIMEOUT_MS = 30000
+
+# After a failed refresh, sessions show the error instead of retrying until this has passed
+REFRESH_RETRY_COOLDOWN_SECONDS = 60
+
+
+def get_connection(store):
+    # Reuse the pooled connection across refreshes, reconnecting only if it dropped
+    conn = store["conn"]
+    if conn is None or conn.closed:
         conn = psycopg2.connect(
-            host=DB_HOST, database=DB_NAME, user=DB_USER, password=DB_PASSWORD, port=DB_PORT
+            host=DB_HOST, database=DB_NAME, user=DB_USER, password=DB_PASSWORD, port=DB_PORT,
+            connect_timeout=DB_CONNECT_TIMEOUT_SECONDS,
+            options=f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}",
         )
-        # Use CURRENT_DATE to get events happening *today* or in the future
-        query = f"""
-            SELECT title, event_date, venue, neighborhood, price_min, category, deal_description, is_discounted, lat, lon 
-            FROM raw_events 
-            WHERE event_date >= CURRENT_DATE
-            ORDER BY event_date ASC, price_min ASC;
-        """
-        df = pd.read_sql(query, conn)
-        conn.close()
-        
-        if 'event_date' in df.columns:
-            df['event_date'] = pd.to_datetime(df['event_date'])
-            
-        return df
+        # Autocommit keeps the long-lived connection from idling inside a transaction
+        conn.autocommit = True
+        store["conn"] = conn
+    return conn
+
+
+def close_connection(store):
+    if store["conn"] is not None:
+        try:
+            store["conn"].close()
+        except Exception:
+            pass
+        store["conn"] = None
+
+
+def fetch_data(conn):
+    # Use CURRENT_DATE to get events happening *today* or in the future
+    query = f"""
+        SELECT title, event_date, venue, neighborhood, price_min, category, deal_description, is_discounted, lat, lon 
+        FROM raw_events 
+        WHERE event_date >= CURRENT_DATE
+        ORDER BY event_date ASC, price_min ASC;
+    """
+    df = pd.read_sql(query, conn)
+
+    if 'event_date' in df.columns:
+        df['event_date'] = to_chicago_wall_clock(df['event_date'])
+
+    return df
+
+
+@st.cache_resource
+def get_data_store():
+    # One store per server process, shared by every session
+    return {
+        "snapshot": None,   # (DataFrame, fetched_at, generation) of the last good fetch
+        "content_hash": None,
+        "generation": 0,    # Only ever increases, bumped when the fetched data changes
+        "error": None,      # Last refresh error, cleared on success
+        "failed_at": None,  # When the last refresh failed, for the retry cooldown
+        "conn": None,
+        "lock": threading.Lock(),
+    }
+
+
+def refresh_data(store):
+    """Fetch a fresh snapshot, keeping the last good one if the query fails."""
+    start = time.perf_counter()
+    try:
+        try:
+            df = fetch_data(get_connection(store))
+        except psycopg2.extensions.QueryCanceledError:
+            # statement_timeout fired on a live connection, retrying would just double the wait
+            raise
+        except (psycopg2.OperationalError, psycopg2.InterfaceError) as e:
+            # The pooler often drops the connection while it idles between refreshes,
+            # which only shows up once it is used, so reconnect and retry once
+            print(f"⚠️ Connection lost ({e}), reconnecting...")
+            close_connection(store)
+            df = fetch_data(get_connection(store))
+        # Content fingerprint, so the generation (and render caches) only move when the ETL data actually changed
+        content_hash = int(pd.util.hash_pandas_object(df, index=False).sum()) if not df.empty else 0
+        if content_hash != store["content_hash"]:
+            store["content_hash"] = content_hash
+            store["generation"] += 1
+        store["snapshot"] = (df, time.time(), store["generation"])
+        store["error"] = None
+        store["failed_at"] = None
+        print(f"✅ Refreshed {len(df)} events in {(time.perf_counter() - start) * 1000:.0f} ms")
     except Exception as e:
-        st.error(f"Database connection failed: {e}")
-        return pd.DataFrame()
+        store["error"] = e
+        store["failed_at"] = time.time()
+        print(f"❌ Database Error: {e}")
+        # Drop the connection so the next refresh starts from a clean one
+        close_connection(store)
+
+
+def in_retry_cooldown(store):
+    failed_at = store["failed_at"]
+    return failed_at is not None and time.time() - failed_at < REFRESH_RETRY_COOLDOWN_SECONDS
 
-df = fetch_data()
+
+def _refresh_in_background(store):
+    try:
+        refresh_data(store)
+    finally:
+        store["lock"].release()
+
+
+def get_events():
+    """Stale-while-revalidate: always answer from the last good snapshot.
+
+    Only the very first load blocks. Once a snapshot exists, an expired one is
+    still served while a single background thread refreshes it; the lock makes
+    sure concurrent sessions never trigger more than one query at a time.
+    Right after a failure, no refresh is attempted until the cooldown passes.
+    """
+    store = get_data_store()
+
+    if store["snapshot"] is None:
+        if not in_retry_cooldown(store):
+            with store["lock"]:
+                # Another session may have finished (or failed) the first load while we waited
+                if store["snapshot"] is None and not in_retry_cooldown(store):
+                    refresh_data(store)
+    elif time.time() - store["snapshot"][1] > DATA_TTL_SECONDS and not in_retry_cooldown(store):
+        if store["lock"].acquire(blocking=False):
+            threading.Thread(target=_refresh_in_background, args=(store,), daemon=True).start()
+
+    return store["snapshot"], store["error"]
+
+
+def format_age(seconds):
+    if seconds < 60:
+        return "just now"
+    if seconds < 3600:
+        return f"{int(seconds // 60)} min ago"
+    if seconds < 86400:
+        return f"{int(seconds // 3600)} hr ago"
+    return f"{int(seconds // 86400)} days ago"
+
+
+# Memory budget for the shared filter/render cache
+RENDER_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# How long a session waits for another one rendering the same key before rendering it itself
+RENDER_WAIT_TIMEOUT_SECONDS = 30
+
+
+@st.cache_resource
+def get_render_cache():
+    # Process-wide LRU of filtered results and rendered HTML, shared by every session
+    return {
+        "entries": OrderedDict(),   # key -> (value, size_bytes)
+        "bytes": 0,
+        "data_version": None,
+        "hits": 0,
+        "misses": 0,
+        "evictions": 0,
+        "building": {},             # key -> threading.Event while one session renders it
+        "lock": threading.Lock(),
+    }
+
+
+def _estimate_size(value):
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, (list, tuple)):
+        return sum(_estimate_size(item) for item in value)
+    return sys.getsizeof(value)
+
+
+def render_cache_get(key, build, data_version):
+    """Return the cached value for a filter state, building it on a miss.
+
+    Keys include the data version, and versions only ever increase, so the whole
+    cache is dropped the first time a newer one is seen and a session still
+    carrying an older version is served without storing or clearing anything.
+    Only one session renders a given key at a time, the others wait for it.
+    """
+    cache = get_render_cache()
+
+    while True:
+        with cache["lock"]:
+            if cache["data_version"] is None or data_version > cache["data_version"]:
+                cache["entries"].clear()
+                cache["bytes"] = 0
+                cache["data_version"] = data_version
+
+            if key in cache["entries"]:
+                cache["entries"].move_to_end(key)
+                cache["hits"] += 1
+                return cache["entries"][key][0]
+
+            pending = cache["building"].get(key)
+            if pending is None:
+                cache["misses"] += 1
+                pending = threading.Event()
+                cache["building"][key] = pending
+                break
+
+        # Another session is already rendering this key, wait and look again. If it
+        # failed or wasn't stored, the loop lets this session build it instead.
+        if not pending.wait(timeout=RENDER_WAIT_TIMEOUT_SECONDS):
+            with cache["lock"]:
+                cache["misses"] += 1
+            return build()
+
+    try:
+        # Build outside the lock so one slow render doesn't block other keys
+        value = build()
+        size = _estimate_size(value)
+
+        with cache["lock"]:
+            # Skip storing renders of an old version, or ones that can never fit
+            if cache["data_version"] == data_version and size <= RENDER_CACHE_MAX_BYTES:
+                if key not in cache["entries"]:
+                    cache["entries"][key] = (value, size)
+                    cache["bytes"] += size
+
+                while cache["bytes"] > RENDER_CACHE_MAX_BYTES:
+                    _, (_, evicted_size) = cache["entries"].popitem(last=False)
+                    cache["bytes"] -= evicted_size
+                    cache["evictions"] += 1
+
+        return value
+    finally:
+        with cache["lock"]:
+            cache["building"].pop(key, None)
+        pending.set()
+
+
+def render_cache_stats():
+    cache = get_render_cache()
+    with cache["lock"]:
+        return {
+            "hits": cache["hits"],
+            "misses": cache["misses"],
+            "evictions": cache["evictions"],
+            "entries": len(cache["entries"]),
+            "bytes": cache["bytes"],
+        }
+
+
+def filter_events(df, selected_cat, show_only_free):
+    filtered_df = df.copy()
+    if selected_cat != "All":
+        filtered_df = filtered_df[filtered_df['category'] == selected_cat]
+    if show_only_free:
+        filtered_df = filtered_df[filtered_df['price_min'] == 0.0]
+    return filtered_df
+
+
+def _compact_html(html):
+    # One line per card, so empty placeholders never end the markdown HTML block early
+    return " ".join(line.strip() for line in html.splitlines() if line.strip())
+
+
+def build_feed_html(filtered_df):
+    """Render the event cards into one HTML string per feed column."""
+    columns = [[], [], []]
+    for index, row in filtered_df.reset_index().iterrows():
+        col_idx = index % 3
+
+        # Format date for the card
+        date_str = row['event_date'].strftime('%b %d, %Y - %I:%M %p') if pd.notnull(row['event_date']) else 'Time TBA'
+
+        if pd.isna(row['price_min']):
+            price_str = "Varies" 
+        elif row['price_min'] > 0:
+            price_str = f"${row['price_min']:.2f}"
+        else:
+            price_str = "FREE"
+
+        deal_desc = str(row['deal_description']) if pd.notnull(row['deal_description']) else ""
+        is_link = deal_desc.startswith('http')
+
+        if is_link:
+            btn_text = "Get Tickets ↗" if "ticket" in deal_desc.lower() else "More Info ↗"
+            btn_class = "btn-primary"
+            link_url = deal_desc
+        else:
+            btn_text = "Search Event ↗"
+            btn_class = "btn-secondary" 
+            # Create a specific search query for the user
+            search_query = urllib.parse.quote_plus(f"{row['title']} {row['venue']} Chicago")
+            link_url = f"https://www.google.com/search?q={search_query}"
+
+        btn_html = f'<a href="{link_url}" target="_blank" class="{btn_class}">{btn_text}</a>'
+
+        deal_note = f"✨ {deal_desc}" if not is_link and deal_desc else ""
+        deal_badge = '<span class="pill-deal">Deal</span>' if deal_desc or row.get('is_discounted') else ''
+        price_class = "price-free" if price_str == "FREE" else "price-text"
+
+        # Dynamic Category Color Logic
+        cat_val = row['category']
+        cat_color, cat_bg = CATEGORY_COLORS.get(cat_val, ("#94A3B8", "rgba(148, 163, 184, 0.15)")) 
+
+        deal_html = f'<p class="deal-text" title="{deal_note}">{deal_note}</p>' if deal_note else ''
+
+        card_html = f"""
+        <div class="event-card" style="animation-delay: {index * 30}ms;">
+            <div class="card-top-row">
+                <span class="pill-category" style="color: {cat_color}; background-color: {cat_bg}; border-color: {cat_color}40;">
+                    {cat_val}
+                </span>
+                {deal_badge}
+            </div>
+            <h3 class="card-title" title="{row['title']}">{row['title']}</h3>
+            <div style="margin-bottom: 1rem;">
+                <div class="card-meta">📅 <span>{date_str}</span></div>
+                <div class="card-meta">📍 <span>{row['venue']}</span></div>
+            </div>
+            <div class="card-footer">
+                <div style="display: flex; align-items: center; gap: 0.375rem;">
+                    <span style="color: var(--muted-foreground); font-size: 14px;">🏷️</span>
+                    <span class="{price_class}">{price_str}</span>
+                </div>
+                {btn_html}
+            </div>
+            {deal_html}
+        </div>
+        """
+
+        columns[col_idx].append(_compact_html(card_html))
+
+    return ["".join(cards) for cards in columns]
+
+
+def build_map_html(filtered_df):
+    """Render the venue map as a standalone HTML document, or None if nothing has coordinates."""
+    map_df = filtered_df.dropna(subset=['lat', 'lon'])
+    if map_df.empty:
+        return None
+
+    folium, plugins = load_map_stack()
+    chicago_map = folium.Map(location=[41.8781, -87.6298], zoom_start=11, tiles="CartoDB dark_matter", scrollWheelZoom=False)
+    grouped = map_df.groupby(['venue', 'lat', 'lon'])
+
+    for (venue, lat, lon), group in grouped:
+        event_count = len(group)
+
+        # Compiling multiple events per venue into a structured list
+        events_list_html = ""
+        for _, e_row in group.iterrows():
+            e_title = str(e_row['title']).replace("'", "&#39;")
+            e_time = e_row['event_date'].strftime('%I:%M %p') if pd.notnull(e_row['event_date']) else ''
+            e_price = "FREE" if e_row['price_min'] == 0 else (f"${e_row['price_min']:.2f}" if pd.notnull(e_row['price_min']) else "Varies")
+
+            events_list_html += f"""
+            <li style='margin-bottom: 6px; line-height: 1.2;'>
+                <strong style="color: #00D2FF;">{e_title}</strong><br>
+                <span style='color: #94A3B8; font-size: 11px;'>{e_time} • {e_price}</span>
+            </li>
+            """
+
+        popup_html = f"""
+        <div style="width: 260px; font-family: 'Inter', sans-serif; background: #0B0F19; padding: 10px; border-radius: 8px;">
+            <h4 style="margin-top: 0; color: #F8FAFC; margin-bottom: 10px; padding-bottom: 5px; border-bottom: 1px solid #1E293B; font-size: 14px;">{venue}</h4>
+            <ul style="padding-left: 15px; margin-top: 0; font-size: 12px; list-style-type: none; margin: 0; padding: 0;">
+                {events_list_html}
+            </ul>
+        </div>
+        """
+
+        # Matching BeautifyIcon color to the primary neon
+        icon = plugins.BeautifyIcon(
+            icon_shape='marker',
+            number=event_count,
+            border_color='#00D2FF',
+            text_color='#00D2FF',
+            background_color='#0B0F19'
+        )
+
+        folium.Marker(
+            location=[lat, lon],
+            popup=folium.Popup(popup_html, max_width=300),
+            tooltip=f"{venue} ({event_count} Events)",
+            icon=icon
+        ).add_to(chicago_map)
+
+    return chicago_map.get_root().render()
+
+
+@st.cache_data(max_entries=2)
+def get_recurring_deals(day):
+    # Expanded once per Chicago date, windows that already closed are dropped per request
+    return expand_recurring_deals(day)
+
+
+def get_open_deals():
+    now = now_in_chicago()
+    return open_deals(get_recurring_deals(now.date()), now)
+
+
+def merge_events(events_df, deals_df):
+    # Recurring deals live as rules, not rows, so they are merged in when the request is
+    # served rather than frozen into the DB snapshot, which may be stale
+    if deals_df.empty:
+        return events_df
+    df = pd.concat([events_df, deals_df], ignore_index=True)
+    return df.sort_values(['event_date', 'price_min'], na_position='last', ignore_index=True)
+
+
+def get_data_version(snapshot, deals_df):
+    # Ordered so newer data always compares greater: the snapshot generation only grows,
+    # and within a day open deals only ever drop out, so fewer open deals means newer
+    return (snapshot[2], today_in_chicago(), -len(deals_df))
+
+
+snapshot, fetch_error = get_events()
+if snapshot is not None:
+    events_df, fetched_at, _ = snapshot
+    deals_df = get_open_deals()
+    data_version = get_data_version(snapshot, deals_df)
+    df = render_cache_get(("events", data_version),
+                          lambda: merge_events(events_df, next_occurrences(deals_df)), data_version)
+else:
+    df, fetched_at, data_version = pd.DataFrame(), None, None
+    if fetch_error is not None:
+        st.error(f"Database connection failed: {fetch_error}")
 
 if not df.empty:
     colA, colB = st.columns([3, 1])
@@ -231,6 +745,7 @@ if not df.empty:
                 </svg>
                 <span class="live-count">{len(df)}</span>
                 <span class="live-text">Live Events</span>
+                <span class="live-age">· Updated {format_age(time.time() - fetched_at)}</span>
             </div>
         </div>
         """, unsafe_allow_html=True)
@@ -264,66 +779,8 @@ if not df.empty:
                 on_change=on_category_change,
             )
 
-            # 5. Inject Dynamic CSS to magically style the Radio Widget into Glass Pills
-            radio_css = """<style>
-            /* Make the background a glass container */
-            [data-testid="stRadio"] {
-                background-color: var(--surface); backdrop-filter: blur(10px);
-                padding: 12px 16px; border-radius: 0.75rem; border: 1px solid var(--border);
-            }
-            /* Make the 'Filter by' text neon and uppercase */
-            [data-testid="stRadio"] > label {
-                font-size: 0.8rem !important; font-weight: 700 !important; color: var(--foreground) !important;
-                text-transform: uppercase !important; letter-spacing: 0.5px !important; margin-bottom: 8px !important;
-            }
-            /* Hide the actual radio circle selectors */
-            [data-testid="stRadio"] div[role="radiogroup"] > label > div:first-child { display: none; }
-            /* Align them horizontally with a gap */
-            [data-testid="stRadio"] div[role="radiogroup"] { display: flex; gap: 10px; flex-wrap: wrap; }
-            /* Base shape of the pill */
-            [data-testid="stRadio"] div[role="radiogroup"] > label {
-                padding: 8px 16px !important; border-radius: 9999px !important; font-size: 0.85rem !important;
-                font-weight: 600 !important; cursor: pointer !important; transition: all 0.3s ease !important;
-                margin: 0 !important; display: inline-flex; align-items: center; justify-content: center;
-            }
-            [data-testid="stRadio"] div[role="radiogroup"] > label p { color: inherit !important; font-weight: 600 !important; }
-            """
-
-            # Loop through options and assign specific colors using CSS nth-child
-            for i, cat in enumerate(filter_options, 1):
-                if cat == "All":
-                    color, bg = ("#F8FAFC", "rgba(248, 250, 252, 0.15)")
-                else:
-                    color, bg = CATEGORY_COLORS.get(cat, ("#94A3B8", "rgba(148, 163, 184, 0.15)"))
-                
-                if cat == selected_cat:
-                    # ✅ ACTIVE STATE (Explicitly targeting the 'p' tag for text color)
-                    radio_css += f"""
-                    [data-testid="stRadio"] div[role="radiogroup"] > label:nth-child({i}) {{
-                        background-color: {color} !important; 
-                        border: 1px solid {color} !important; 
-                        box-shadow: 0 0 15px {color} !important;
-                    }}
-                    [data-testid="stRadio"] div[role="radiogroup"] > label:nth-child({i}) p {{
-                        color: #0B0F19 !important; 
-                    }}
-                    """
-                else:
-                    # ✅ INACTIVE STATE (Explicitly targeting the 'p' tag for text color)
-                    radio_css += f"""
-                    [data-testid="stRadio"] div[role="radiogroup"] > label:nth-child({i}) {{
-                        background-color: {bg} !important; 
-                        border: 1px solid {color} !important;
-                    }}
-                    [data-testid="stRadio"] div[role="radiogroup"] > label:nth-child({i}) p {{
-                        color: {color} !important;
-                    }}
-                    [data-testid="stRadio"] div[role="radiogroup"] > label:nth-child({i}):hover {{
-                        box-shadow: 0 0 12px {color} !important; transform: translateY(-2px) !important;
-                    }}
-                    """
-            
-            radio_css += "</style>"
+            # 5. Inject cached CSS to magically style the Radio Widget into Glass Pills
+            radio_css = build_radio_css(tuple(filter_options))[selected_cat]
             st.markdown(radio_css, unsafe_allow_html=True)
 
         with f_toggle_col:
@@ -331,136 +788,53 @@ if not df.empty:
             st.write("")
             show_only_free = st.toggle("Free Events Only")
 
-    # Apply filters based on the selected Radio value
-    filtered_df = df.copy()
-    if selected_cat != "All":
-        filtered_df = filtered_df[filtered_df['category'] == selected_cat]
-    if show_only_free:
-        filtered_df = filtered_df[filtered_df['price_min'] == 0.0]
+    # Apply filters based on the selected Radio value, shared across sessions
+    filtered_df = render_cache_get(("filtered", data_version, selected_cat, show_only_free),
+                                   lambda: filter_events(df, selected_cat, show_only_free), data_version)
 
     st.write("") 
-    tab1, tab2 = st.tabs(["📇 Event Feed", "📍 Live Map"])
-
-    with tab1:
+    # A segmented control reruns the script on change, unlike st.tabs which runs every
+    # tab body each time, so the map (and its folium import) only renders when selected
+    st.session_state.setdefault("view_switch", FEED_VIEW)
+    st.session_state.setdefault("last_view", FEED_VIEW)
+
+    # Clicking the active segment deselects it, so put the previous view back instead
+    def on_view_change():
+        if st.session_state.view_switch is None:
+            st.session_state.view_switch = st.session_state.last_view
+        st.session_state.last_view = st.session_state.view_switch
+
+    view = st.segmented_control(
+        "View",
+        [FEED_VIEW, MAP_VIEW],
+        key="view_switch",
+        on_change=on_view_change,
+        label_visibility="collapsed",
+    )
+
+    if view == FEED_VIEW:
+        feed_columns = render_cache_get(("feed", data_version, selected_cat, show_only_free),
+                                        lambda: build_feed_html(filtered_df), data_version)
         cols = st.columns(3)
-        for index, row in filtered_df.reset_index().iterrows():
-            col_idx = index % 3
-            
-            # Format date for the card
-            date_str = row['event_date'].strftime('%b %d, %Y - %I:%M %p') if pd.notnull(row['event_date']) else 'Time TBA'
-            
-            if pd.isna(row['price_min']):
-                price_str = "Varies" 
-            elif row['price_min'] > 0:
-                price_str = f"${row['price_min']:.2f}"
-            else:
-                price_str = "FREE"
-                
-            deal_desc = str(row['deal_description']) if pd.notnull(row['deal_description']) else ""
-            is_link = deal_desc.startswith('http')
-            
-            if is_link:
-                btn_text = "Get Tickets ↗" if "ticket" in deal_desc.lower() else "More Info ↗"
-                btn_class = "btn-primary"
-                link_url = deal_desc
-            else:
-                btn_text = "Search Event ↗"
-                btn_class = "btn-secondary" 
-                # Create a specific search query for the user
-                search_query = urllib.parse.quote_plus(f"{row['title']} {row['venue']} Chicago")
-                link_url = f"https://www.google.com/search?q={search_query}"
-                
-            btn_html = f'<a href="{link_url}" target="_blank" class="{btn_class}">{btn_text}</a>'
-                
-            deal_note = f"✨ {deal_desc}" if not is_link and deal_desc else ""
-            deal_badge = '<span class="pill-deal">Deal</span>' if deal_desc or row.get('is_discounted') else ''
-            price_class = "price-free" if price_str == "FREE" else "price-text"
-
-            # Dynamic Category Color Logic
-            cat_val = row['category']
-            cat_color, cat_bg = CATEGORY_COLORS.get(cat_val, ("#94A3B8", "rgba(148, 163, 184, 0.15)")) 
-
-            deal_html = f'<p class="deal-text" title="{deal_note}">{deal_note}</p>' if deal_note else ''
-
-            card_html = f"""
-            <div class="event-card" style="animation-delay: {index * 30}ms;">
-                <div class="card-top-row">
-                    <span class="pill-category" style="color: {cat_color}; background-color: {cat_bg}; border-color: {cat_color}40;">
-                        {cat_val}
-                    </span>
-                    {deal_badge}
-                </div>
-                <h3 class="card-title" title="{row['title']}">{row['title']}</h3>
-                <div style="margin-bottom: 1rem;">
-                    <div class="card-meta">📅 <span>{date_str}</span></div>
-                    <div class="card-meta">📍 <span>{row['venue']}</span></div>
-                </div>
-                <div class="card-footer">
-                    <div style="display: flex; align-items: center; gap: 0.375rem;">
-                        <span style="color: var(--muted-foreground); font-size: 14px;">🏷️</span>
-                        <span class="{price_class}">{price_str}</span>
-                    </div>
-                    {btn_html}
-                </div>
-                {deal_html}
-            </div>
-            """
-            
-            with cols[col_idx]:
-                st.markdown(card_html, unsafe_allow_html=True)
-
-    with tab2:
-        map_df = filtered_df.dropna(subset=['lat', 'lon'])
-
-        if not map_df.empty:
-            chicago_map = folium.Map(location=[41.8781, -87.6298], zoom_start=11, tiles="CartoDB dark_matter", scrollWheelZoom=False)
-            grouped = map_df.groupby(['venue', 'lat', 'lon'])
-
-            for (venue, lat, lon), group in grouped:
-                event_count = len(group)
-                
-                # Compiling multiple events per venue into a structured list
-                events_list_html = ""
-                for _, e_row in group.iterrows():
-                    e_title = str(e_row['title']).replace("'", "&#39;")
-                    e_time = e_row['event_date'].strftime('%I:%M %p') if pd.notnull(e_row['event_date']) else ''
-                    e_price = "FREE" if e_row['price_min'] == 0 else (f"${e_row['price_min']:.2f}" if pd.notnull(e_row['price_min']) else "Varies")
-                    
-                    events_list_html += f"""
-                    <li style='margin-bottom: 6px; line-height: 1.2;'>
-                        <strong style="color: #00D2FF;">{e_title}</strong><br>
-                        <span style='color: #94A3B8; font-size: 11px;'>{e_time} • {e_price}</span>
-                    </li>
-                    """
-
-                popup_html = f"""
-                <div style="width: 260px; font-family: 'Inter', sans-serif; background: #0B0F19; padding: 10px; border-radius: 8px;">
-                    <h4 style="margin-top: 0; color: #F8FAFC; margin-bottom: 10px; padding-bottom: 5px; border-bottom: 1px solid #1E293B; font-size: 14px;">{venue}</h4>
-                    <ul style="padding-left: 15px; margin-top: 0; font-size: 12px; list-style-type: none; margin: 0; padding: 0;">
-                        {events_list_html}
-                    </ul>
-                </div>
-                """
+        for col, col_html in zip(cols, feed_columns):
+            if col_html:
+                with col:
+                    st.markdown(col_html, unsafe_allow_html=True)
+
+    else:
+        map_html = render_cache_get(("map", data_version, selected_cat, show_only_free),
+                                    lambda: build_map_html(filtered_df), data_version)
 
-                # Matching BeautifyIcon color to the primary neon
-                icon = plugins.BeautifyIcon(
-                    icon_shape='marker',
-                    number=event_count,
-                    border_color='#00D2FF',
-                    text_color='#00D2FF',
-                    background_color='#0B0F19'
-                )
-
-                folium.Marker(
-                    location=[lat, lon],
-                    popup=folium.Popup(popup_html, max_width=300),
-                    tooltip=f"{venue} ({event_count} Events)",
-                    icon=icon
-                ).add_to(chicago_map)
-
-            st_folium(chicago_map, width="100%", height=600, returned_objects=[])
+        if map_html:
+            components.html(map_html, height=600)
         else:
             st.info("No spatial data available for the current filters.")
 
 else:
-    st.warning("No data found. Is the ETL pipeline running?")
\ No newline at end of file
+    st.warning("No data found. Is the ETL pipeline running?")
+
+# Per-rerun script time, covers fetching, filtering and rendering
+cache_stats = render_cache_stats()
+print(f"⏱️ Rerun finished in {(time.perf_counter() - _RUN_START) * 1000:.0f} ms (imports {IMPORT_MS:.0f} ms) | "
+      f"render cache {cache_stats['hits']} hits / {cache_stats['misses']} misses, "
+      f"{cache_stats['entries']} entries, {cache_stats['bytes'] / 1024 / 1024:.1f} MB")
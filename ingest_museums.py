@@ -3,6 +3,7 @@ import requests
 import os
 from dotenv import load_dotenv
 from datetime import datetime
+from zoneinfo import ZoneInfo
 
 # Load the secrets from the .env file
 load_dotenv()
@@ -64,7 +65,8 @@ def load_exhibitions_to_db(exhibitions):
             description = "Free for Illinois residents on Thursdays 5 PM - 8 PM"
             
             # --- NEW CODE: Generate the timestamp ---
-            event_date = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            # Chicago wall-clock time, like every other event_date (the runner itself is on UTC)
+            event_date = datetime.now(ZoneInfo("America/Chicago")).strftime('%Y-%m-%d %H:%M:%S')
 
             # --- LOAD ---
             # Notice we added event_date to the columns list, an extra %s, and event_date to the tuple!
@@ -1,8 +1,9 @@
 import psycopg2
-from datetime import datetime
 import os
 from dotenv import load_dotenv
 
+from recurring_deals import RECURRING_DEALS, expand_recurring_deals, open_deals, next_occurrences
+
 # Load the secrets from the .env file
 load_dotenv()
 
@@ -13,19 +14,16 @@ DB_PASSWORD = os.getenv("DB_PASSWORD")
 DB_PORT = "5432"
 DB_NAME = "postgres"
 
-def seed_recurring_deals():
-    deals = [
-        ('AMC Discount Tuesdays', 'AMC River East 21', 'Streeterville', 7.00, 'Movie', 'Member discount price'),
-        ('Regal Value Tuesdays', 'Regal Webster Place', 'Lincoln Park', 7.99, 'Movie', 'Standard 2D movies'),
-        ('Music Box Matinee', 'Music Box Theatre', 'Lakeview', 11.00, 'Movie', 'Before 5 PM daily'),
-        ('Logan Theatre Open Mic', 'The Logan Theatre', 'Logan Square', 0.00, 'Comedy', 'Free entry, No cover'),
-        ('Second City Student Standby', 'Second City', 'Old Town', 0.00, 'Comedy', 'Free tickets for students 1hr before show')
-    ]
+def clean_up_recurring_deals():
+    # Recurring deals are now expanded at query time from the rules in recurring_deals.py.
+    # This used to insert them again on every run with event_date = now(), so here we
+    # only remove those piled-up copies and keep raw_events free of recurring rows.
+    deal_keys = [(deal["title"], deal["venue"]) for deal in RECURRING_DEALS]
 
-    conn = None 
+    conn = None
     try:
         print("Connecting to the ETL Engine via IPv4 Session Pooler...")
-        
+
         conn = psycopg2.connect(
             host=DB_HOST,
             database=DB_NAME,
@@ -35,23 +33,15 @@ def seed_recurring_deals():
         )
         cur = conn.cursor()
 
-        print("Inserting deals...")
-        
-        # --- NEW CODE: Generate the timestamp ---
-        event_date = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-
-        for deal in deals:
-            # We add the event_date to the end of our deal tuple
-            deal_with_date = deal + (event_date,)
-            
-            # Notice the added event_date column and the extra %s placeholder!
-            cur.execute("""
-                INSERT INTO raw_events (title, venue, neighborhood, price_min, category, is_discounted, deal_description, event_date)
-                VALUES (%s, %s, %s, %s, %s, TRUE, %s, %s)
-            """, deal_with_date)
+        print("Removing legacy recurring deal rows...")
+        cur.execute("""
+            DELETE FROM raw_events
+            WHERE is_discounted = TRUE AND (title, venue) IN %s
+        """, (tuple(deal_keys),))
+        removed_count = cur.rowcount
 
         conn.commit()
-        print(f"✅ Success! Ingested {len(deals)} deals.")
+        print(f"✅ Success! Removed {removed_count} stale deal rows.")
         cur.close()
 
     except Exception as e:
@@ -61,5 +51,12 @@ def seed_recurring_deals():
             conn.close()
             print("Database connection closed.")
 
+def preview_recurring_deals():
+    upcoming = next_occurrences(open_deals(expand_recurring_deals()))
+    print(f"📅 Next occurrence of each of the {len(RECURRING_DEALS)} recurring deals:")
+    for _, row in upcoming.iterrows():
+        print(f"   {row['event_date']:%a %b %d %I:%M %p}  {row['title']}")
+
 if __name__ == "__main__":
-    seed_recurring_deals()
\ No newline at end of file
+    clean_up_recurring_deals()
+    preview_recurring_deals()
@@ -3,6 +3,7 @@ import requests
 import os
 from dotenv import load_dotenv
 from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
 
 # This loads the secrets from your .env file
 load_dotenv() 
@@ -15,6 +16,9 @@ DB_PASSWORD = os.getenv("DB_PASSWORD")
 DB_PORT = "5432"
 DB_NAME = "postgres"
 
+# event_date is stored as Chicago wall-clock time
+CHICAGO_TZ = ZoneInfo("America/Chicago")
+
 def fetch_ticketmaster_events():
     print("Extracting live data from Ticketmaster API...")
     
@@ -90,8 +94,13 @@ def load_events_to_db(events):
             if local_date:
                 event_date = f"{local_date} {local_time}"
             else:
-                # Ultimate fallback
-                event_date = dates.get('dateTime', datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+                # Ultimate fallback, dateTime is UTC so bring it to Chicago wall-clock time too
+                utc_date = dates.get('dateTime')
+                if utc_date:
+                    local_dt = datetime.fromisoformat(utc_date.replace('Z', '+00:00')).astimezone(CHICAGO_TZ)
+                else:
+                    local_dt = datetime.now(CHICAGO_TZ)
+                event_date = local_dt.strftime('%Y-%m-%d %H:%M:%S')
 
             # --- DATABASE INSERTION ---
             cur.execute("""
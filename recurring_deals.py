@@ -0,0 +1,171 @@
+from datetime import datetime, date, time, timedelta
+from zoneinfo import ZoneInfo
+
+import pandas as pd
+from dateutil.rrule import rrulestr
+
+CHICAGO_TZ = ZoneInfo("America/Chicago")
+
+# Every rule is anchored here so INTERVAL>1 schedules keep a stable phase
+RULE_ANCHOR = date(2024, 1, 1)
+
+# How far ahead recurring deals are expanded, long enough that every weekly deal has a next occurrence
+RECURRING_HORIZON_DAYS = 7
+
+# Deals are defined once as RRULE schedules plus the daily time window they apply in.
+# Nothing is stored in raw_events, occurrences are expanded for the query window instead.
+RECURRING_DEALS = [
+    {
+        "title": "AMC Discount Tuesdays",
+        "venue": "AMC River East 21",
+        "neighborhood": "Streeterville",
+        "price_min": 7.00,
+        "category": "Movie",
+        "deal_description": "Member discount price",
+        "rrule": "FREQ=WEEKLY;BYDAY=TU",
+        "window": ("10:00", "23:00"),
+    },
+    {
+        "title": "Regal Value Tuesdays",
+        "venue": "Regal Webster Place",
+        "neighborhood": "Lincoln Park",
+        "price_min": 7.99,
+        "category": "Movie",
+        "deal_description": "Standard 2D movies",
+        "rrule": "FREQ=WEEKLY;BYDAY=TU",
+        "window": ("10:00", "23:00"),
+    },
+    {
+        "title": "Music Box Matinee",
+        "venue": "Music Box Theatre",
+        "neighborhood": "Lakeview",
+        "price_min": 11.00,
+        "category": "Movie",
+        "deal_description": "Before 5 PM daily",
+        "rrule": "FREQ=DAILY",
+        "window": ("11:00", "17:00"),
+    },
+    {
+        "title": "Logan Theatre Open Mic",
+        "venue": "The Logan Theatre",
+        "neighborhood": "Logan Square",
+        "price_min": 0.00,
+        "category": "Comedy",
+        "deal_description": "Free entry, No cover",
+        "rrule": "FREQ=WEEKLY;BYDAY=MO",
+        "window": ("21:00", "23:00"),
+    },
+    {
+        "title": "Second City Student Standby",
+        "venue": "Second City",
+        "neighborhood": "Old Town",
+        "price_min": 0.00,
+        "category": "Comedy",
+        "deal_description": "Free tickets for students 1hr before show",
+        "rrule": "FREQ=DAILY",
+        "window": ("18:00", "19:00"),
+    },
+]
+
+DEAL_COLUMNS = ['title', 'event_date', 'venue', 'neighborhood', 'price_min', 'category',
+                'deal_description', 'is_discounted', 'lat', 'lon']
+
+
+def now_in_chicago():
+    # Naive wall-clock time, matching how event_date is displayed and compared
+    return datetime.now(CHICAGO_TZ).replace(tzinfo=None)
+
+
+def today_in_chicago():
+    return now_in_chicago().date()
+
+
+def to_chicago_wall_clock(values):
+    """Normalise event dates to naive Chicago wall-clock time.
+
+    The ingest scripts insert Chicago wall-clock strings. If raw_events.event_date is a
+    timestamptz they are read back as UTC with the same clock reading, so the tz is
+    dropped without converting (pandas also refuses to sort aware and naive together).
+    """
+    values = pd.Series(values)
+    if values.map(lambda v: getattr(v, 'tzinfo', None) is not None).any():
+        return pd.to_datetime(values, utc=True).dt.tz_localize(None)
+    return pd.to_datetime(values)
+
+
+def _format_time(t):
+    return t.strftime('%I:%M %p').lstrip('0')
+
+
+def format_window(deal):
+    start, end = (time.fromisoformat(t) for t in deal["window"])
+    return f"{_format_time(start)} – {_format_time(end)}"
+
+
+def expand_occurrences(deal, start_date, end_date):
+    """Yield (start, end) of every occurrence of a deal between two dates (inclusive)."""
+    window_start, window_end = (time.fromisoformat(t) for t in deal["window"])
+
+    # Without an INTERVAL the phase doesn't matter, so start at the window itself and
+    # skip stepping through every occurrence since RULE_ANCHOR
+    anchor = RULE_ANCHOR if "INTERVAL=" in deal["rrule"] else start_date
+    rule = rrulestr(deal["rrule"], dtstart=datetime.combine(anchor, window_start))
+
+    # Windows ending at or before their start run past midnight
+    duration = datetime.combine(RULE_ANCHOR, window_end) - datetime.combine(RULE_ANCHOR, window_start)
+    if duration <= timedelta(0):
+        duration += timedelta(days=1)
+
+    for occurrence in rule.between(
+        datetime.combine(start_date, time.min),
+        datetime.combine(end_date, time.max),
+        inc=True,
+    ):
+        yield occurrence, occurrence + duration
+
+
+def expand_recurring_deals(start_date=None, days=RECURRING_HORIZON_DAYS):
+    """Expand every recurring deal into concrete rows shaped like raw_events.
+
+    Rows carry an extra deal_ends column; open_deals() uses it and drops it.
+    """
+    if start_date is None:
+        start_date = today_in_chicago()
+    end_date = start_date + timedelta(days=days - 1)
+
+    rows = []
+    for deal in RECURRING_DEALS:
+        description = f"{deal['deal_description']} · {format_window(deal)}"
+        for starts, ends in expand_occurrences(deal, start_date, end_date):
+            rows.append({
+                "title": deal["title"],
+                "event_date": starts,
+                "venue": deal["venue"],
+                "neighborhood": deal["neighborhood"],
+                "price_min": deal["price_min"],
+                "category": deal["category"],
+                "deal_description": description,
+                "is_discounted": True,
+                "lat": None,
+                "lon": None,
+                "deal_ends": ends,
+            })
+
+    df = pd.DataFrame(rows, columns=DEAL_COLUMNS + ['deal_ends'])
+    df['event_date'] = pd.to_datetime(df['event_date'])
+    df['deal_ends'] = pd.to_datetime(df['deal_ends'])
+    return df
+
+
+def open_deals(deals_df, now=None):
+    """Drop occurrences whose time window has already closed."""
+    if now is None:
+        now = now_in_chicago()
+    return deals_df[deals_df['deal_ends'] > now].drop(columns=['deal_ends']).reset_index(drop=True)
+
+
+def next_occurrences(deals_df):
+    """Keep only the next occurrence of each deal, so daily deals don't flood the feed."""
+    return (deals_df.sort_values('event_date')
+            .drop_duplicates(subset=['title', 'venue'], keep='first')
+            .reset_index(drop=True))
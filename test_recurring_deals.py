@@ -0,0 +1,90 @@
+from datetime import date, datetime
+
+import pandas as pd
+
+from recurring_deals import (expand_occurrences, expand_recurring_deals, next_occurrences,
+                             open_deals, to_chicago_wall_clock)
+
+
+def make_deal(rrule, window):
+    return {
+        "title": "Test Deal",
+        "venue": "Test Venue",
+        "neighborhood": "The Loop",
+        "price_min": 0.00,
+        "category": "Comedy",
+        "deal_description": "Test",
+        "rrule": rrule,
+        "window": window,
+    }
+
+
+def test_weekly_byday_lands_on_tuesdays():
+    deal = make_deal("FREQ=WEEKLY;BYDAY=TU", ("10:00", "23:00"))
+
+    # Sun Oct 18 2026 through Sat Oct 31 2026
+    occurrences = list(expand_occurrences(deal, date(2026, 10, 18), date(2026, 10, 31)))
+
+    assert occurrences == [
+        (datetime(2026, 10, 20, 10, 0), datetime(2026, 10, 20, 23, 0)),
+        (datetime(2026, 10, 27, 10, 0), datetime(2026, 10, 27, 23, 0)),
+    ]
+
+
+def test_interval_rule_keeps_phase_from_anchor():
+    # RULE_ANCHOR (Mon Jan 1 2024) starts the fortnightly cycle, Oct 19 2026 is 146 weeks later so on, Oct 26 is off
+    deal = make_deal("FREQ=WEEKLY;INTERVAL=2;BYDAY=MO", ("21:00", "23:00"))
+
+    occurrences = list(expand_occurrences(deal, date(2026, 10, 18), date(2026, 10, 31)))
+
+    assert [starts for starts, _ in occurrences] == [datetime(2026, 10, 19, 21, 0)]
+
+
+def test_window_crossing_midnight_ends_next_day():
+    deal = make_deal("FREQ=DAILY", ("22:00", "02:00"))
+
+    occurrences = list(expand_occurrences(deal, date(2026, 10, 18), date(2026, 10, 18)))
+
+    assert occurrences == [(datetime(2026, 10, 18, 22, 0), datetime(2026, 10, 19, 2, 0))]
+
+
+def test_open_deals_drops_closed_windows():
+    deals_df = expand_recurring_deals(date(2026, 10, 18), days=2)
+
+    # 5:30 PM on Oct 18: today's matinee (11 AM - 5 PM) has closed, student standby (6 - 7 PM) hasn't
+    still_open = open_deals(deals_df, now=datetime(2026, 10, 18, 17, 30))
+
+    todays = still_open[still_open['event_date'].dt.date == date(2026, 10, 18)]
+    assert "Music Box Matinee" not in set(todays['title'])
+    assert "Second City Student Standby" in set(todays['title'])
+    assert 'deal_ends' not in still_open.columns
+
+
+def test_open_deals_keeps_window_still_running_past_midnight():
+    deals_df = pd.DataFrame({
+        "title": ["Late Show"],
+        "event_date": [datetime(2026, 10, 18, 22, 0)],
+        "deal_ends": [datetime(2026, 10, 19, 2, 0)],
+    })
+
+    assert len(open_deals(deals_df, now=datetime(2026, 10, 19, 1, 0))) == 1
+    assert len(open_deals(deals_df, now=datetime(2026, 10, 19, 2, 0))) == 0
+
+
+def test_next_occurrences_collapses_daily_deals():
+    deals_df = open_deals(expand_recurring_deals(date(2026, 10, 18)), now=datetime(2026, 10, 18, 12, 0))
+
+    upcoming = next_occurrences(deals_df)
+
+    assert len(upcoming) == 5
+    matinee = upcoming[upcoming['title'] == "Music Box Matinee"].iloc[0]
+    assert matinee['event_date'] == datetime(2026, 10, 18, 11, 0)
+
+
+def test_to_chicago_wall_clock_keeps_clock_reading_of_aware_values():
+    aware = pd.Series([pd.Timestamp("2026-10-18 19:00", tz="UTC"), pd.NaT])
+
+    result = to_chicago_wall_clock(aware)
+
+    assert result.iloc[0] == pd.Timestamp("2026-10-18 19:00")
+    assert result.dt.tz is None